@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from tools import batch, money
+from tools.store import ResultsStore, EXACT_RESULT_SCHEMA
+
+
+def test_round_div_modes():
+    num = np.array([25, 35, -25, 26, -26])
+    assert list(money.round_div(num, 10, 'half_even')) == [2, 4, -2, 3, -3]
+    assert list(money.round_div(num, 10, 'half_up')) == [3, 4, -3, 3, -3]
+    assert list(money.round_div(num, 10, 'down')) == [2, 3, -2, 2, -2]
+    assert list(money.round_div(num, 10, 'floor')) == [2, 3, -3, 2, -3]
+    assert list(money.round_div(num, 10, 'ceiling')) == [3, 4, -2, 3, -2]
+
+
+def test_exact_mode_matches_float_mode_to_the_cent():
+    scenarios = {
+        'sector': ['Retail', 'Finance', 'Healthcare', 'Manufacturing'],
+        'strategy': ['Hot Site', 'Warm Site', 'Cold Site', 'Hot Site'],
+        'loss_magnitude': [100000, 123456.78, 9770000, 1],
+        'ef_percent': [100, 33.3, 50, 12.5],
+        'mfa': [True, False, True, True],
+        'phish': [False, True, True, True],
+        'succession': [True, False, False, True],
+    }
+    exact = money.compute(scenarios, mode='exact')
+    floats = money.compute(scenarios, mode='float')
+    assert exact['ale_pre_cents'].dtype == np.int64
+    assert np.allclose(exact['ale_pre'], floats['ale_pre'], atol=0.01)
+    assert np.allclose(exact['ale_post'], floats['ale_post'], atol=0.02)
+    assert np.array_equal(exact['downtime_loss'], floats['downtime_loss'])
+    # Retail, 100000 * 100% * 0.14 = $14,000.00 exactly
+    assert exact['ale_pre_cents'][0] == 1400000
+    assert money.fmt_cents(exact['ale_pre_cents'][0]) == '$14,000.00'
+
+
+def test_overflow_is_detected():
+    with pytest.raises(OverflowError):
+        money.checked_mul([2 ** 40], [2 ** 30])
+    with pytest.raises(OverflowError):
+        money.checked_add([money.INT64_MAX], [1])
+    with pytest.raises(OverflowError):
+        money.compute({'loss_magnitude': 1e17}, mode='exact')
+
+
+def test_exact_totals_in_store(tmp_path):
+    store = ResultsStore(str(tmp_path), schema=EXACT_RESULT_SCHEMA)
+    data = money.compute({'sector': ['Retail', 'Finance'] * 3, 'ef_percent': [10, 20, 30, 40, 50, 60]}, mode='exact')
+    store.append(data)
+    store.append(data)
+    total = store.aggregate('ale_pre_cents', how='sum')
+    assert isinstance(total, int)
+    assert total == 2 * money.sum_cents(data['ale_pre_cents'])
+    assert store.aggregate('ale_pre_cents', how='sum', by='sector')['Retail'] == 2 * int(data['ale_pre_cents'][::2].sum())
+
+
+def test_sum_cents_is_exact_beyond_int64():
+    values = np.full(4, money.INT64_MAX // 2, dtype=np.int64)
+    assert money.sum_cents(values) == 4 * (money.INT64_MAX // 2)
+
+
+def test_sum_cents_block_size_uses_exact_maximum():
+    values = np.full(3, 3074457345618258603, dtype=np.int64)
+    assert money.sum_cents(values) == 3 * 3074457345618258603
+    with pytest.raises(OverflowError):
+        money.sum_cents([money.INT64_MIN])
+
+
+def test_calc_cli_exact_money_mode(monkeypatch, capsys):
+    from tools import calc
+    monkeypatch.setattr('sys.argv', ['calc.py', '--sector', 'Retail', '--revenue', '100000', '--mfa', '--money-mode', 'exact'])
+    calc.main()
+    out = capsys.readouterr().out
+    assert 'ALE (pre): $14,000.00' in out
+    assert 'ALE (post): $7,000.00' in out
+
+
+def test_evaluate_exact_chunking_is_seamless():
+    cols = batch.prepare({'sector': ['Retail', 'Finance', 'Healthcare'] * 7, 'ef_percent': np.arange(21) * 4.7,
+                          'mfa': np.arange(21) % 2 == 0, 'succession': np.arange(21) % 3 == 0})
+    whole = money.evaluate_exact(cols)
+    chunked = money.evaluate_exact(cols, chunk_rows=4)
+    for name, values in whole.items():
+        assert np.array_equal(values, chunked[name])
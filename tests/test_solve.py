@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from tools import calc, batch, solve
+
+
+def test_compute_batch_matches_scalar_formulas():
+    out = batch.compute_batch({
+        'sector': ['Retail', 'Finance'],
+        'strategy': ['Hot Site', 'Warm Site'],
+        'loss_magnitude': 100000,
+        'ef_percent': [100, 50],
+        'mfa': [True, False],
+        'phish': [False, True],
+        'succession': [False, True],
+    })
+    assert out['ale_pre'][0] == pytest.approx(calc.compute_ale_pre('Retail', 100000, 100))
+    assert out['ale_post'][1] == pytest.approx(calc.compute_ale_post('Finance', 100000, 50, phish=True))
+    assert out['downtime_loss'][1] == pytest.approx(calc.compute_downtime_loss('Finance', 'Warm Site', succession=True))
+    cost = calc.DR_STRATEGIES['Hot Site']['annual_cost'] + calc.CONTROL_COSTS['mfa']
+    avoided = calc.compute_downtime_loss('Retail', 'Cold Site') - calc.compute_downtime_loss('Retail', 'Hot Site')
+    assert out['rosi'][0] == pytest.approx(calc.compute_rosi(out['ale_pre'][0], out['ale_post'][0], avoided, cost))
+
+
+def test_solve_cost_for_target_rosi_round_trips():
+    scenarios = {'sector': list(calc.SECTOR_DATA), 'strategy': 'Warm Site', 'mfa': True}
+    cost = solve.solve(scenarios, ('rosi', 0.5), 'cost_of_controls')
+    rosi = batch.compute_batch(dict(scenarios, cost_of_controls=cost))['rosi']
+    assert np.allclose(rosi, 0.5)
+
+
+def test_solve_ef_for_target_ale_and_unreachable():
+    scenarios = {'sector': 'Retail', 'loss_magnitude': 100000, 'mfa': True}
+    ef = solve.solve(scenarios, ('ale_post', [3500, 1e9]), 'ef_percent')
+    # Retail ARO 0.14 halved by MFA: 100000 * ef * 0.07 = 3500 -> ef = 50%
+    assert ef[0] == pytest.approx(50)
+    assert np.isnan(ef[1])
+
+
+def test_bisection_agrees_with_closed_form():
+    scenarios = {'sector': ['Retail', 'Healthcare'], 'strategy': 'Hot Site', 'phish': True}
+    closed = solve.solve(scenarios, ('rosi', 1.0), 'cost_of_controls')
+    bisected = solve.solve(scenarios, ('rosi', 1.0), 'cost_of_controls', bracket=(1.0, 1e10))
+    assert np.allclose(closed, bisected, rtol=1e-6)
+
+    rate = solve.solve(scenarios, ('rosi', 1.0), 'downtime_cost_per_hour')
+    rosi = batch.compute_batch(dict(scenarios, downtime_cost_per_hour=rate))['rosi']
+    assert rosi[0] == pytest.approx(1.0)
+    # Healthcare clears 100% ROSI on breach savings alone, even with no downtime cost
+    assert np.isnan(rate[1])
+
+
+def test_bisection_root_on_bracket_bound():
+    assert solve.bisect(lambda x: x, 0.0, 0.0, 10.0) == 0.0
+    assert solve.bisect(lambda x: x, 10.0, 0.0, 10.0) == 10.0
+    assert solve.bisect(lambda x: -x, 0.0, 0.0, 10.0) == 0.0
+    ef = solve.solve({'sector': 'Retail'}, ('ale_pre', 0.0), 'ef_percent', bracket=(0, 100))
+    assert ef[0] == 0.0
+
+
+def test_cost_without_benefit_is_unreachable():
+    # Cold Site with no controls: nothing to gain, so no spend reaches 50% ROSI
+    cost = solve.solve({'sector': 'Retail', 'strategy': 'Cold Site'}, ('rosi', 0.5), 'cost_of_controls')
+    assert np.isnan(cost[0])
+
+
+@pytest.mark.parametrize('var', ['loss_magnitude', 'ef_percent', 'aro'])
+def test_rosi_closed_forms_agree_with_bisection(var):
+    scenarios = {'sector': ['Retail', 'Finance', 'Manufacturing'], 'strategy': 'Cold Site',
+                 'mfa': True, 'phish': [True, False, True], 'loss_magnitude': 5e6, 'ef_percent': 60}
+    closed = solve.solve(scenarios, ('rosi', [0.5, 2.0, -2.0]), var)
+    bisected = solve.solve(scenarios, ('rosi', [0.5, 2.0, -2.0]), var, bracket=solve.BRACKETS[var])
+    assert np.allclose(closed, bisected, rtol=1e-6, equal_nan=True)
+    assert not np.isnan(closed[0]) and np.isnan(closed[2])
+    rosi = batch.compute_batch(dict(scenarios, **{var: closed[:2]}, sector=['Retail', 'Finance'], phish=[True, False]))['rosi']
+    assert np.allclose(rosi, [0.5, 2.0])
+
+
+def test_rosi_closed_form_without_controls_is_unreachable():
+    # No ARO controls: ROSI doesn't depend on EF at all
+    ef = solve.solve({'sector': 'Retail', 'strategy': 'Cold Site', 'cost_of_controls': 1000}, ('rosi', 0.5), 'ef_percent')
+    assert np.isnan(ef[0])
@@ -0,0 +1,115 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from tools import batch
+from tools.store import ResultsStore
+
+
+def _batch():
+    return batch.compute_batch({
+        'sector': ['Retail', 'Finance', 'Retail', 'Healthcare', 'Retail'],
+        'strategy': ['Hot Site', 'Cold Site', 'Warm Site', 'Hot Site', 'Hot Site'],
+        'ef_percent': [10, 20, 30, 40, 50],
+        'mfa': [True, False, True, False, True],
+    })
+
+
+def test_append_and_reopen(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    data = _batch()
+    assert store.append(data) == 5
+    store.append(data)
+
+    reopened = ResultsStore(str(tmp_path))
+    assert len(reopened) == 10
+    assert np.allclose(reopened.column('rosi')[:5], data['rosi'])
+    assert list(reopened.decode('sector', reopened.column('sector')[:2])) == ['Retail', 'Finance']
+
+
+def test_index_filters_aggregates_and_top_k(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    data = _batch()
+    store.append(data)
+
+    assert store.count(sector='Retail') == 3
+    assert store.count(sector='Retail', strategy='Hot Site') == 2
+    assert store.count(where=[('ef_percent', '>=', 30), ('sector', '!=', 'Healthcare')]) == 2
+
+    assert store.aggregate('ale_pre', how='sum', sector='Retail') == pytest.approx(data['ale_pre'][[0, 2, 4]].sum())
+    by_strategy = store.aggregate('ef_percent', how='max', by='strategy')
+    assert by_strategy == {'Cold Site': 20, 'Warm Site': 30, 'Hot Site': 50}
+
+    top = store.top_k('ale_post', k=2, columns=['sector', 'ale_post'], chunk_rows=2)
+    expected = np.sort(data['ale_post'])[::-1][:2]
+    assert np.allclose(top['ale_post'], expected)
+    assert set(top) == {'sector', 'ale_post', '_row'}
+
+
+def test_uncommitted_append_is_discarded(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append(_batch())
+    # Simulate a writer that died after writing column bytes but before meta.json
+    with open(os.path.join(str(tmp_path), 'rosi.col'), 'ab') as fh:
+        fh.write(b'\0' * 24)
+
+    reopened = ResultsStore(str(tmp_path))
+    assert len(reopened) == 5
+    assert os.path.getsize(os.path.join(str(tmp_path), 'rosi.col')) == 5 * 8
+    with open(os.path.join(str(tmp_path), 'meta.json')) as fh:
+        assert json.load(fh)['rows'] == 5
+
+
+def test_uncommitted_index_for_new_pair_is_discarded(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append(batch.compute_batch({'sector': 'Retail', 'strategy': 'Hot Site', 'ef_percent': [10, 20]}))
+    # A writer that died after starting a posting list for a new pair
+    finance = store.meta['categories']['sector'].index('Finance')
+    with open(os.path.join(str(tmp_path), 'index', f'{finance}-0.idx'), 'wb') as fh:
+        np.array([0, 1], dtype='<i8').tofile(fh)
+
+    reopened = ResultsStore(str(tmp_path))
+    reopened.append(batch.compute_batch({'sector': 'Finance', 'strategy': 'Cold Site'}))
+    rows = list(reopened.scan(columns=['sector'], sector='Finance'))
+    assert [list(chunk['_row']) for chunk in rows] == [[2]]
+    assert list(rows[0]['sector']) == [finance]
+
+
+def test_truncate_drops_emptied_posting_lists(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append(_batch())
+    store.append(batch.compute_batch({'sector': 'Manufacturing', 'strategy': 'Warm Site'}))
+    store.truncate(5)
+
+    reopened = ResultsStore(str(tmp_path))
+    assert len(reopened) == 5
+    assert reopened.count(sector='Manufacturing') == 0
+    assert reopened.count(sector='Retail') == 3
+    assert len(os.listdir(os.path.join(str(tmp_path), 'index'))) == len(reopened.meta['index'])
+
+
+def test_count_reads_only_filter_columns(tmp_path, monkeypatch):
+    store = ResultsStore(str(tmp_path))
+    store.append(_batch())
+    read = []
+    column = store.column
+    monkeypatch.setattr(store, 'column', lambda name: read.append(name) or column(name))
+
+    assert store.count(where=[('ef_percent', '>', 15)], sector='Retail') == 2
+    assert read == ['ef_percent']
+    assert list(next(store.scan(columns=[]))) == ['_row']
+
+
+def test_top_k_on_bool_and_category_columns(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append(_batch())
+
+    assert list(store.top_k('mfa', k=3, columns=[])['_row']) == [0, 2, 4]
+    assert list(store.top_k('mfa', k=2, largest=False, columns=[])['_row']) == [1, 3]
+
+    codes = np.asarray(store.column('sector'))
+    expected = np.argsort(codes, kind='stable')[:2]
+    lowest = store.top_k('sector', k=2, largest=False, columns=['sector'])
+    assert list(lowest['_row']) == list(expected)
+    assert list(lowest['sector']) == list(store.decode('sector', codes[expected]))
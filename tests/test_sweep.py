@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from tools import sweep
+from tools.store import ResultsStore
+
+SPEC = {
+    'sectors': ['Retail', 'Finance'],
+    'ef_percent': {'start': 0, 'stop': 100, 'step': 25},
+    'loss_magnitude': [None, 100000],
+    'controls': 'all',
+    'unit_rows': 50,
+}
+
+
+class Interrupt(Exception):
+    pass
+
+
+def test_grid_expansion_and_units():
+    grid = sweep.expand_spec(SPEC)
+    assert grid['ef_percent'] == [0, 25, 50, 75, 100]
+    assert len(grid['controls']) == 8
+    # 2 sectors * 3 strategies * 2 losses * 5 EFs * 1 ARO * 8 control combos
+    assert sweep.grid_size(grid) == 480
+    units = sweep.work_units(grid)
+    assert len(units) == 10 and units[-1][2] == 480
+
+    scenarios = sweep.scenarios_for(grid, 0, 480)
+    assert np.isnan(scenarios['loss_magnitude'][0]) and scenarios['loss_magnitude'][-1] == 100000
+    assert scenarios['mfa'].sum() == 240
+
+
+def test_interrupted_sweep_resumes(tmp_path):
+    out = str(tmp_path / 'run')
+
+    def stop_after_three(done, total, rows, elapsed):
+        if done == 3:
+            raise Interrupt()
+
+    with pytest.raises(Interrupt):
+        sweep.run_sweep(SPEC, out, workers=1, progress=stop_after_three)
+    assert len(ResultsStore(str(tmp_path / 'run' / 'store'))) == 150
+
+    seen = []
+    store = sweep.run_sweep(SPEC, out, workers=1, progress=lambda done, *_: seen.append(done))
+    assert seen == [4, 5, 6, 7, 8, 9, 10]
+    assert len(store) == 480
+    assert store.count(sector='Finance', strategy='Hot Site') == 80
+
+    fresh = sweep.run_sweep(SPEC, str(tmp_path / 'fresh'), workers=1, progress=None)
+    assert store.aggregate('rosi', how='sum') == pytest.approx(fresh.aggregate('rosi', how='sum'))
+
+
+def test_uncheckpointed_rows_are_rolled_back(tmp_path):
+    out = str(tmp_path / 'run')
+    spec = dict(SPEC, mode='exact')
+    sweep.run_sweep(spec, out, workers=1, progress=None)
+    store = ResultsStore(str(tmp_path / 'run' / 'store'))
+    expected = store.aggregate('ale_pre_cents', how='sum')
+    # A unit appended to the store but never checkpointed
+    store.append(sweep.run_unit(sweep.expand_spec(spec), 0, 50))
+
+    resumed = sweep.run_sweep(spec, out, workers=1, progress=None)
+    assert len(resumed) == 480
+    assert resumed.aggregate('ale_pre_cents', how='sum') == expected
+
+
+def test_process_pool_and_spec_mismatch(tmp_path):
+    out = str(tmp_path / 'run')
+    store = sweep.run_sweep(SPEC, out, workers=2, progress=None)
+    assert len(store) == 480
+    assert store.count(where=[('ef_percent', '==', 0)]) == 96
+    with pytest.raises(ValueError):
+        sweep.run_sweep(dict(SPEC, unit_rows=10), out, workers=1)
+
+
+def test_torn_checkpoint_line_is_cut_before_resuming(tmp_path):
+    out = str(tmp_path / 'run')
+
+    def stop_after_two(done, total, rows, elapsed):
+        if done == 2:
+            raise Interrupt()
+
+    with pytest.raises(Interrupt):
+        sweep.run_sweep(SPEC, out, workers=1, progress=stop_after_two)
+    checkpoint = tmp_path / 'run' / 'checkpoint.jsonl'
+    with open(checkpoint, 'a') as fh:
+        fh.write('{"unit": 2, "ro')
+
+    def stop_after_four(done, total, rows, elapsed):
+        if done == 4:
+            raise Interrupt()
+
+    with pytest.raises(Interrupt):
+        sweep.run_sweep(SPEC, out, workers=1, progress=stop_after_four)
+    done, rows = sweep._read_checkpoint(str(checkpoint))
+    assert done == {0, 1, 2, 3} and rows == 200
+
+    seen = []
+    store = sweep.run_sweep(SPEC, out, workers=1, progress=lambda *args: seen.append(args[:3]))
+    assert len(store) == 480
+    # rows reported are those written by this run, not the whole store
+    assert seen[0] == (5, 10, 50) and seen[-1] == (10, 10, 280)
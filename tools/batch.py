@@ -0,0 +1,137 @@
+"""
+Vectorized versions of the tools/calc.py formulas.
+
+Scenarios are passed as a dict of columns. Every column may be a scalar or a
+sequence; all columns are broadcast to a common length, so a single call can
+evaluate millions of scenarios at once.
+
+Input columns (all optional):
+  - sector                  name from SECTOR_DATA (default 'Retail')
+  - strategy                name from DR_STRATEGIES (default 'Cold Site')
+  - loss_magnitude          defaults to the sector AvgBreachCost
+  - ef_percent              exposure factor 0-100 (default 100)
+  - aro                     overrides the sector ARO (NaN = use sector ARO)
+  - mfa, phish, succession  control flags (default False)
+  - downtime_cost_per_hour  defaults to the sector DowntimeCostPerHour
+  - recovery_time_hours     defaults to the strategy recovery time
+  - cost_of_controls        defaults to strategy annual cost + selected controls,
+                            the same basis the CLI uses for ROSI
+
+compute_batch() returns the same columns plus ale_pre, ale_post,
+downtime_cold, downtime_loss, avoided_downtime_loss and rosi.
+"""
+import numpy as np
+
+from tools.calc import (
+    SECTOR_DATA,
+    DR_STRATEGIES,
+    CONTROL_COSTS,
+    MFA_ARO_FACTOR,
+    PHISH_ARO_FACTOR,
+    SUCCESSION_DOWNTIME_FACTOR,
+)
+
+INPUT_COLUMNS = (
+    'sector', 'strategy', 'loss_magnitude', 'ef_percent', 'aro',
+    'mfa', 'phish', 'succession', 'downtime_cost_per_hour',
+    'recovery_time_hours', 'cost_of_controls',
+)
+OUTPUT_COLUMNS = (
+    'ale_pre', 'ale_post', 'downtime_cold', 'downtime_loss',
+    'avoided_downtime_loss', 'rosi',
+)
+
+
+def lookup(names, table, key):
+    """Map an array of names to table[name][key] with one vectorized compare per table entry."""
+    names = np.ravel(names)
+    values = np.full(names.shape, np.nan)
+    matched = np.zeros(names.shape, dtype=bool)
+    for name, entry in table.items():
+        hit = names == name
+        values[hit] = entry[key]
+        matched |= hit
+    if not matched.all():
+        raise ValueError(f'Unknown name: {names[~matched][0]}')
+    return values
+
+
+def _fill(values, default):
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values), default, values)
+
+
+def prepare(scenarios):
+    """Broadcast the scenario columns and fill defaults. Returns a dict of 1-D arrays."""
+    unknown = set(scenarios) - set(INPUT_COLUMNS)
+    if unknown:
+        raise ValueError(f'Unknown scenario columns: {sorted(unknown)}')
+
+    raw = {
+        'sector': np.asarray(scenarios.get('sector', 'Retail')),
+        'strategy': np.asarray(scenarios.get('strategy', 'Cold Site')),
+    }
+    for name in ('loss_magnitude', 'aro', 'downtime_cost_per_hour',
+                 'recovery_time_hours', 'cost_of_controls'):
+        raw[name] = np.asarray(scenarios.get(name, np.nan), dtype=np.float64)
+    raw['ef_percent'] = np.asarray(scenarios.get('ef_percent', 100.0), dtype=np.float64)
+    for name in ('mfa', 'phish', 'succession'):
+        raw[name] = np.asarray(scenarios.get(name, False), dtype=bool)
+
+    cols = dict(zip(raw, (np.ravel(a) for a in np.broadcast_arrays(*raw.values()))))
+
+    sector, strategy = cols['sector'], cols['strategy']
+    cols['loss_magnitude'] = _fill(cols['loss_magnitude'], lookup(sector, SECTOR_DATA, 'AvgBreachCost'))
+    cols['aro'] = _fill(cols['aro'], lookup(sector, SECTOR_DATA, 'ARO'))
+    cols['downtime_cost_per_hour'] = _fill(cols['downtime_cost_per_hour'],
+                                           lookup(sector, SECTOR_DATA, 'DowntimeCostPerHour'))
+    cols['recovery_time_hours'] = _fill(cols['recovery_time_hours'],
+                                        lookup(strategy, DR_STRATEGIES, 'recovery_time_hours'))
+    default_cost = (lookup(strategy, DR_STRATEGIES, 'annual_cost')
+                    + cols['mfa'] * CONTROL_COSTS['mfa']
+                    + cols['phish'] * CONTROL_COSTS['phish']
+                    + cols['succession'] * CONTROL_COSTS['succession'])
+    cols['cost_of_controls'] = _fill(cols['cost_of_controls'], default_cost)
+    return cols
+
+
+def aro_factor(cols):
+    """Combined ARO multiplier of the selected controls."""
+    return np.where(cols['mfa'], MFA_ARO_FACTOR, 1.0) * np.where(cols['phish'], PHISH_ARO_FACTOR, 1.0)
+
+
+def downtime_factor(cols):
+    """Downtime cost multiplier of the selected controls."""
+    return np.where(cols['succession'], SUCCESSION_DOWNTIME_FACTOR, 1.0)
+
+
+def evaluate(cols):
+    """Compute the output columns for already-prepared scenario columns."""
+    ef = np.clip(cols['ef_percent'], 0, 100) / 100.0
+    ale_pre = cols['loss_magnitude'] * ef * cols['aro']
+    ale_post = ale_pre * aro_factor(cols)
+
+    cold_hours = DR_STRATEGIES['Cold Site']['recovery_time_hours']
+    downtime_cold = cols['downtime_cost_per_hour'] * cold_hours
+    downtime_loss = cols['downtime_cost_per_hour'] * downtime_factor(cols) * cols['recovery_time_hours']
+    avoided = np.maximum(0, downtime_cold - downtime_loss)
+
+    cost = cols['cost_of_controls']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rosi = np.where(cost == 0, np.inf, ((ale_pre - ale_post) + avoided - cost) / cost)
+
+    return {
+        'ale_pre': ale_pre,
+        'ale_post': ale_post,
+        'downtime_cold': downtime_cold,
+        'downtime_loss': downtime_loss,
+        'avoided_downtime_loss': avoided,
+        'rosi': rosi,
+    }
+
+
+def compute_batch(scenarios):
+    """Evaluate many scenarios at once. Returns inputs and outputs as a dict of arrays."""
+    cols = prepare(scenarios)
+    cols.update(evaluate(cols))
+    return cols
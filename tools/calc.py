@@ -10,6 +10,8 @@ It prints a short report and example Hot Site ROI calculation.
 """
 import argparse
 import json
+import os
+import sys
 from datetime import datetime
 from io import BytesIO
 try:
@@ -58,6 +60,11 @@ CONTROL_COSTS = {"mfa": 20000, "phish": 5000, "succession": 3000}
 # Update default control costs to match UI defaults
 CONTROL_COSTS = {"mfa": 25000, "phish": 7500, "succession": 5000}
 
+# Multipliers applied by the optional controls
+MFA_ARO_FACTOR = 0.5
+PHISH_ARO_FACTOR = 0.8
+SUCCESSION_DOWNTIME_FACTOR = 0.9
+
 
 def fmt(n):
     return f"${n:,.2f}"
@@ -421,9 +428,9 @@ def compute_ale_post(sector, loss_magnitude, ef_percent, mfa=False, phish=False)
     sectorARO = SECTOR_DATA[sector]['ARO']
     reduced = sectorARO
     if mfa:
-        reduced = reduced * 0.5
+        reduced = reduced * MFA_ARO_FACTOR
     if phish:
-        reduced = reduced * 0.8
+        reduced = reduced * PHISH_ARO_FACTOR
     ef = max(0, min(ef_percent, 100)) / 100.0
     return loss_magnitude * ef * reduced
 
@@ -432,7 +439,7 @@ def compute_downtime_loss(sector, strategy_name, succession=False):
     s = SECTOR_DATA[sector]
     downtime_per_hour = s.get('DowntimeCostPerHour', 0)
     if succession:
-        downtime_per_hour = downtime_per_hour * 0.9
+        downtime_per_hour = downtime_per_hour * SUCCESSION_DOWNTIME_FACTOR
     strategy = DR_STRATEGIES.get(strategy_name, DR_STRATEGIES['Cold Site'])
     return downtime_per_hour * strategy['recovery_time_hours']
 
@@ -443,6 +450,17 @@ def compute_rosi(ale_pre, ale_post, avoided_downtime_loss, cost_of_controls):
     return ((ale_pre - ale_post) + avoided_downtime_loss - cost_of_controls) / cost_of_controls
 
 
+def _import_money():
+    # tools/money.py needs the tools package, which isn't importable when
+    # this file is run directly as python tools/calc.py
+    try:
+        from tools import money
+    except ImportError:
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from tools import money
+    return money
+
+
 def main():
     p = argparse.ArgumentParser()
     p.add_argument('--sector', default='Retail', choices=list(SECTOR_DATA.keys()))
@@ -459,6 +477,8 @@ def main():
     p.add_argument('--succession', action='store_true', help='Enable Succession planning (reduce downtime cost 10%)')
     p.add_argument('--revenue', type=float, default=None, help='Optional revenue value to use instead of sector avg breach cost')
     p.add_argument('--pdf', type=str, default=None, help='If provided, write a PDF report to this path')
+    p.add_argument('--money-mode', choices=['float', 'exact'], default='float',
+                   help='exact: compute ALE, downtime and ROSI figures in integer cents (see tools/money.py)')
     args = p.parse_args()
 
     sector = args.sector
@@ -489,6 +509,31 @@ def main():
 
     rosi = compute_rosi(ale_pre, ale_post, money_saved_by_bcdr, cost_controls)
 
+    show = fmt
+    if args.money_mode == 'exact':
+        money = _import_money()
+        exact = money.compute({
+            'sector': sector,
+            'strategy': args.dr_strategy,
+            'loss_magnitude': loss_magnitude,
+            'ef_percent': args.ef,
+            'mfa': args.mfa,
+            'phish': args.phish,
+            'succession': args.succession,
+            'cost_of_controls': cost_controls,
+        }, mode='exact')
+        # the report ALE uses the sector ARO, as compute_ale_pre does
+        sle = int(money.mul_rate(money.to_cents(args.asset), money.to_rate(max(0, min(args.ef, 100)) / 100.0)))
+        expected_breach = int(money.mul_rate(money.to_cents(data['AvgBreachCost']), money.to_rate(aro)))
+        ale_pre = int(exact['ale_pre_cents'][0])
+        ale_post = int(exact['ale_post_cents'][0])
+        downtime_cold = int(exact['downtime_cold_cents'][0])
+        downtime_selected = int(exact['downtime_loss_cents'][0])
+        money_saved_by_bcdr = int(exact['avoided_downtime_loss_cents'][0])
+        cost_controls = int(exact['cost_of_controls_cents'][0])
+        rosi = float(exact['rosi'][0])
+        show = money.fmt_cents
+
     print('\nCyber-Risk ROI & BCDR Calculator — Report')
     print('Generated:', datetime.utcnow().isoformat())
     print('Sector:', sector)
@@ -496,16 +541,16 @@ def main():
     print('Exposure Factor (EF):', f"{args.ef}%")
     print('ARO (sector):', SECTOR_DATA[sector]['ARO'])
     print('\nComputed Values:')
-    print('  SLE:', fmt(sle))
-    print('  ALE (pre):', fmt(ale_pre))
-    print('  ALE (post):', fmt(ale_post))
-    print('  Expected Annual Breach Cost (AvgBreachCost * ARO):', fmt(expected_breach))
+    print('  SLE:', show(sle))
+    print('  ALE (pre):', show(ale_pre))
+    print('  ALE (post):', show(ale_post))
+    print('  Expected Annual Breach Cost (AvgBreachCost * ARO):', show(expected_breach))
 
     print('\nDowntime & ROSI:')
-    print('  Downtime loss (Cold):', fmt(downtime_cold))
-    print('  Downtime loss (Selected):', fmt(downtime_selected))
-    print('  Money saved by BCDR:', fmt(money_saved_by_bcdr))
-    print('  Cost of controls (DR + selected controls):', fmt(cost_controls))
+    print('  Downtime loss (Cold):', show(downtime_cold))
+    print('  Downtime loss (Selected):', show(downtime_selected))
+    print('  Money saved by BCDR:', show(money_saved_by_bcdr))
+    print('  Cost of controls (DR + selected controls):', show(cost_controls))
     print('  ROSI:', (f"{rosi*100:.1f}%" if rosi != float('inf') else 'inf'))
 
     print('\nHot Site ROI example (defaults can be overridden):')
@@ -518,6 +563,11 @@ def main():
 
     # If requested, produce a PDF using the same data
     if args.pdf:
+        if args.money_mode == 'exact':
+            # the PDF template formats dollars
+            sle, ale_pre, ale_post, expected_breach, downtime_cold, downtime_selected, money_saved_by_bcdr, cost_controls = (
+                v / 100.0 for v in (sle, ale_pre, ale_post, expected_breach, downtime_cold, downtime_selected,
+                                    money_saved_by_bcdr, cost_controls))
         report_data = {
             'title': 'Cyber-Risk ROI & BCDR Report',
             'sector': sector,
@@ -0,0 +1,289 @@
+"""
+Exact money arithmetic on int64 cents.
+
+The float path (tools/calc.py, tools/batch.py) keeps money as float dollars and
+only rounds for display, so totals over large portfolios drift. This module
+runs the same formulas on integer cents:
+
+  - dollar inputs are converted to cents once, with an explicit rounding mode
+  - ARO, EF, recovery hours and the control multipliers are fixed-point
+    rates in parts per million (RATE_SCALE)
+  - every cents * rate product is rounded back to whole cents with the rule
+    configured for that step (see DEFAULT_ROUNDING)
+  - every product and sum is checked for int64 overflow and raises
+    OverflowError instead of wrapping
+
+compute() evaluates a batch of scenarios in either 'float' or 'exact' mode.
+In exact mode the money outputs also come back as int64 '<name>_cents'
+columns, and the float dollar columns are derived from those cents.
+"""
+import numpy as np
+
+from tools.calc import DR_STRATEGIES, MFA_ARO_FACTOR, PHISH_ARO_FACTOR, SUCCESSION_DOWNTIME_FACTOR
+from tools import batch
+
+MONEY_MODES = ('float', 'exact')
+
+RATE_SCALE = 1_000_000
+
+INT64_MAX = np.iinfo(np.int64).max
+INT64_MIN = np.iinfo(np.int64).min
+
+ROUNDING_MODES = ('half_even', 'half_up', 'down', 'floor', 'ceiling')
+
+# Rounding applied at each step of the exact calculation
+DEFAULT_ROUNDING = {
+    'input': 'half_even',     # float dollars -> cents
+    'ef': 'half_even',        # loss magnitude * EF -> SLE
+    'aro': 'half_even',       # SLE * ARO -> ALE pre-controls
+    'controls': 'half_even',  # MFA / phishing / succession multipliers
+    'hours': 'half_even',     # hourly downtime cost * recovery hours
+}
+
+# Rows per block in evaluate_exact()
+EXACT_CHUNK_ROWS = 1 << 15
+
+MONEY_OUTPUTS = ('ale_pre', 'ale_post', 'downtime_cold', 'downtime_loss', 'avoided_downtime_loss')
+
+
+def _check_rounding(rounding):
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f'Unknown rounding mode {rounding!r}; choose from {ROUNDING_MODES}')
+
+
+def round_div(num, den, rounding='half_even'):
+    """Divide int64 num by the positive integer den, rounding to an integer as requested."""
+    _check_rounding(rounding)
+    num = np.asarray(num, dtype=np.int64)
+    den = np.int64(den)
+    half = den // 2
+    if rounding in ('half_even', 'half_up') and (num.size == 0 or int(num.max()) <= INT64_MAX - half):
+        # floor((num + half) / den) rounds halves towards +inf; floor_divide by a
+        # scalar is much cheaper than divmod, and only exact ties need fixing up
+        shifted = num + half
+        q = shifted // den
+        tie = (shifted - q * den == 0) if den % 2 == 0 else np.zeros(q.shape, dtype=bool)
+        if np.any(tie):
+            q_tie = q[tie]
+            if rounding == 'half_up':
+                # ties away from zero: negative halves go down instead
+                q[tie] = q_tie - (q_tie <= 0)
+            else:
+                q[tie] = q_tie - (q_tie % 2 == 1)
+        return q
+    q, r = np.divmod(num, den)
+    # np.divmod floors, so 0 <= r < den and the exact quotient is q + r / den
+    if rounding == 'floor':
+        up = np.zeros(q.shape, dtype=bool)
+    elif rounding == 'ceiling':
+        up = r != 0
+    elif rounding == 'down':
+        up = (r != 0) & (q < 0)
+    elif rounding == 'half_up':
+        up = (2 * r > den) | ((2 * r == den) & (q >= 0))
+    else:
+        up = (2 * r > den) | ((2 * r == den) & (q % 2 == 1))
+    return q + up
+
+
+def to_cents(dollars, rounding='half_even'):
+    """Convert float dollars to int64 cents."""
+    return _to_fixed(dollars, 100, rounding)
+
+
+def to_rate(value, rounding='half_even'):
+    """Convert a float multiplier (e.g. ARO 0.59) to fixed-point parts per million."""
+    return _to_fixed(value, RATE_SCALE, rounding)
+
+
+def _to_fixed(value, scale, rounding):
+    _check_rounding(rounding)
+    scaled = np.asarray(value, dtype=np.float64) * scale
+    if scaled.size:
+        # min/max propagate NaN, so two reductions cover both checks
+        lo, hi = scaled.min(), scaled.max()
+        if not (np.isfinite(lo) and np.isfinite(hi)):
+            raise ValueError('Cannot convert NaN or infinite values to fixed point')
+        if lo < -2.0 ** 63 or hi >= 2.0 ** 63:
+            raise OverflowError('Value does not fit in int64 fixed point')
+    if rounding == 'half_even':
+        fixed = np.rint(scaled)
+    elif rounding == 'half_up':
+        fixed = np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)
+    elif rounding == 'down':
+        fixed = np.trunc(scaled)
+    elif rounding == 'floor':
+        fixed = np.floor(scaled)
+    else:
+        fixed = np.ceil(scaled)
+    return fixed.astype(np.int64)
+
+
+def _max_abs(a):
+    # as a Python int, so abs(INT64_MIN) doesn't wrap
+    return max(abs(int(a.min())), abs(int(a.max())))
+
+
+def checked_mul(a, b):
+    """Elementwise int64 product; raises OverflowError instead of wrapping."""
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    if b.ndim == 0:
+        # constant multiplier: one bound for the whole column
+        bound = INT64_MAX // max(abs(int(b)), 1)
+        if a.size and (int(a.max()) > bound or int(a.min()) < -bound):
+            raise OverflowError('int64 overflow in money multiplication')
+        return a * b
+    if a.size == 0 or _max_abs(a) * _max_abs(b) <= INT64_MAX:
+        # the largest magnitudes can't overflow, so no element can
+        return a * b
+    # A float64 product below 2**62 is certainly below 2**63, so only the rows
+    # near the limit need the exact integer check
+    near = np.abs(a.astype(np.float64) * b.astype(np.float64)) >= 2.0 ** 62
+    if np.any(near):
+        # |a| * |b| <= INT64_MAX  <=>  |a| <= INT64_MAX // |b|; abs of INT64_MIN wraps, so reject it
+        abs_a, abs_b = np.abs(a[near]), np.abs(b[near])
+        if np.any((abs_a < 0) | (abs_b < 0) | (abs_a > INT64_MAX // np.maximum(abs_b, 1))):
+            raise OverflowError('int64 overflow in money multiplication')
+    return a * b
+
+
+def checked_add(a, b):
+    """Elementwise int64 sum; raises OverflowError instead of wrapping."""
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    out = a + b
+    if np.any(((a >= 0) == (b >= 0)) & ((out >= 0) != (a >= 0))):
+        raise OverflowError('int64 overflow in money addition')
+    return out
+
+
+def checked_sub(a, b):
+    """Elementwise int64 difference; raises OverflowError instead of wrapping."""
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    out = a - b
+    if np.any(((a >= 0) != (b >= 0)) & ((out >= 0) != (a >= 0))):
+        raise OverflowError('int64 overflow in money subtraction')
+    return out
+
+
+def mul_rate(cents, rate, rounding='half_even'):
+    """Multiply cents by a fixed-point rate and round back to whole cents."""
+    rate = np.asarray(rate, dtype=np.int64)
+    if rate.ndim == 0 and rate % RATE_SCALE == 0:
+        # whole-number rate (e.g. recovery hours): exact, no rounding needed
+        return checked_mul(cents, rate // RATE_SCALE)
+    return round_div(checked_mul(cents, rate), RATE_SCALE, rounding)
+
+
+def sum_cents(cents):
+    """
+    Exact total of an int64 cents array as a Python int.
+
+    The array is summed in int64 blocks small enough that no block can
+    overflow, and the block totals are combined with Python integers.
+    """
+    cents = np.ravel(np.asarray(cents, dtype=np.int64))
+    if len(cents) == 0:
+        return 0
+    if np.any(cents == INT64_MIN):
+        raise OverflowError('INT64_MIN cents cannot be summed safely')
+    largest = int(np.max(np.abs(cents)))
+    block = max(1, INT64_MAX // max(largest, 1))
+    return sum(int(cents[lo:lo + block].sum()) for lo in range(0, len(cents), block))
+
+
+def fmt_cents(cents):
+    """Format integer cents like calc.fmt, without going through float."""
+    cents = int(cents)
+    sign = '-' if cents < 0 else ''
+    dollars, rem = divmod(abs(cents), 100)
+    return f'{sign}${dollars:,}.{rem:02d}'
+
+
+def evaluate_exact(cols, rounding=None, chunk_rows=EXACT_CHUNK_ROWS):
+    """Exact counterpart of batch.evaluate() for already-prepared scenario columns."""
+    rules = dict(DEFAULT_ROUNDING, **(rounding or {}))
+    for rule in rules.values():
+        _check_rounding(rule)
+    n = len(cols['ef_percent'])
+    if n <= chunk_rows:
+        return _evaluate_exact_chunk(cols, rules)
+    # The integer path needs several temporaries per step; in cache-sized
+    # chunks they are reused instead of faulting in fresh memory each time
+    out = None
+    for lo in range(0, n, chunk_rows):
+        part = _evaluate_exact_chunk({name: values[lo:lo + chunk_rows] for name, values in cols.items()}, rules)
+        if out is None:
+            out = {name: np.empty(n, dtype=values.dtype) for name, values in part.items()}
+        for name, values in part.items():
+            out[name][lo:lo + len(values)] = values
+    return out
+
+
+def _evaluate_exact_chunk(cols, rules):
+
+    # The control multipliers are constants: convert them once, and fold the
+    # four MFA/phishing combinations into rates instead of working per row
+    mfa_rate = to_rate(MFA_ARO_FACTOR)
+    phish_rate = to_rate(PHISH_ARO_FACTOR)
+    succession_rate = to_rate(SUCCESSION_DOWNTIME_FACTOR)
+    cold_rate = to_rate(DR_STRATEGIES['Cold Site']['recovery_time_hours'])
+    combos = np.array([RATE_SCALE, phish_rate, mfa_rate, mul_rate(mfa_rate, phish_rate, rules['controls'])])
+    control = combos[cols['mfa'].astype(np.intp) * 2 + cols['phish']]
+
+    loss = to_cents(cols['loss_magnitude'], rules['input'])
+    ef = to_rate(np.clip(cols['ef_percent'], 0, 100) / 100.0, rules['input'])
+    aro = to_rate(cols['aro'], rules['input'])
+
+    sle = mul_rate(loss, ef, rules['ef'])
+    ale_pre = mul_rate(sle, aro, rules['aro'])
+    ale_post = mul_rate(ale_pre, control, rules['controls'])
+
+    per_hour = to_cents(cols['downtime_cost_per_hour'], rules['input'])
+    downtime_cold = mul_rate(per_hour, cold_rate, rules['hours'])
+    per_hour_selected = per_hour.copy()
+    succession = cols['succession']
+    per_hour_selected[succession] = mul_rate(per_hour[succession], succession_rate, rules['controls'])
+    hours = cols['recovery_time_hours']
+    if np.all(hours == np.trunc(hours)) and np.all(np.abs(hours) < 2.0 ** 53):
+        # whole hours, as in DR_STRATEGIES: a plain checked product, no rounding
+        downtime_loss = checked_mul(per_hour_selected, hours.astype(np.int64))
+    else:
+        downtime_loss = mul_rate(per_hour_selected, to_rate(hours, rules['input']), rules['hours'])
+    avoided = np.maximum(0, checked_sub(downtime_cold, downtime_loss))
+
+    cost = to_cents(cols['cost_of_controls'], rules['input'])
+    net = checked_sub(checked_add(checked_sub(ale_pre, ale_post), avoided), cost)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rosi = np.where(cost == 0, np.inf, net / cost)
+
+    return {
+        'ale_pre_cents': ale_pre,
+        'ale_post_cents': ale_post,
+        'downtime_cold_cents': downtime_cold,
+        'downtime_loss_cents': downtime_loss,
+        'avoided_downtime_loss_cents': avoided,
+        'cost_of_controls_cents': cost,
+        'rosi': rosi,
+    }
+
+
+def compute(scenarios, mode='float', rounding=None):
+    """
+    Evaluate scenarios like batch.compute_batch(), in 'float' or 'exact' money mode.
+
+    In exact mode the result also holds int64 '<name>_cents' columns for the
+    money outputs and cost_of_controls; the float dollar columns are cents / 100.
+    """
+    if mode not in MONEY_MODES:
+        raise ValueError(f'Unknown money mode {mode!r}; choose from {MONEY_MODES}')
+    if mode == 'float':
+        return batch.compute_batch(scenarios)
+    cols = batch.prepare(scenarios)
+    exact = evaluate_exact(cols, rounding)
+    cols.update(exact)
+    for name in MONEY_OUTPUTS:
+        cols[name] = exact[f'{name}_cents'] / 100.0
+    return cols
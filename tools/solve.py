@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Goal-seek / inverse solver for the calculator formulas.
+
+Answers questions like "what is the most we can spend on controls and still
+hit 50% ROSI?" or "what EF gets ALE under $X?" for many scenarios at once.
+Scenario columns are the ones documented in tools/batch.py.
+
+Usage:
+  python -m tools.solve --target rosi=0.5 --solve-for cost_of_controls --sector Retail Finance --mfa
+  python -m tools.solve --target ale_post=100000 --solve-for ef_percent --csv scenarios.csv
+
+Where the output is linear in the unknown a closed form is used; every other
+combination falls back to vectorized bisection over a bracket.
+"""
+import argparse
+import csv
+import itertools
+import sys
+
+import numpy as np
+
+from tools.calc import SECTOR_DATA, DR_STRATEGIES, fmt
+from tools import batch
+
+TARGETS = ('rosi', 'ale_pre', 'ale_post', 'downtime_loss')
+
+# Default search brackets used when no closed form applies
+BRACKETS = {
+    'loss_magnitude': (0.0, 1e13),
+    'ef_percent': (0.0, 100.0),
+    'aro': (0.0, 100.0),
+    'downtime_cost_per_hour': (0.0, 1e13),
+    'recovery_time_hours': (0.0, 1e5),
+    'cost_of_controls': (1e-9, 1e13),
+}
+
+
+def _divide(num, den):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(den > 0, num / den, np.nan)
+
+
+def _ale_scale(cols, output):
+    # ale_pre / ale_post divided by everything except loss, EF and ARO
+    return batch.aro_factor(cols) if output == 'ale_post' else 1.0
+
+
+def _solve_cost(cols, target):
+    out = batch.evaluate(cols)
+    benefit = (out['ale_pre'] - out['ale_post']) + out['avoided_downtime_loss']
+    # with no benefit ROSI is -1 for any spend (and inf at zero), never the target
+    return np.where(benefit > 0, _divide(benefit, 1.0 + target), np.nan)
+
+
+def _solve_rosi_linear(cols, target, var):
+    # ROSI * cost = loss * ef * aro * (1 - aro_factor) + avoided - cost, linear in each of loss, EF and ARO
+    out = batch.evaluate(cols)
+    cost = cols['cost_of_controls']
+    factors = {
+        'loss_magnitude': cols['loss_magnitude'],
+        'ef_percent': np.clip(cols['ef_percent'], 0, 100) / 100.0,
+        'aro': cols['aro'],
+    }
+    coef = 1.0 - batch.aro_factor(cols)
+    for name, values in factors.items():
+        if name != var:
+            coef = coef * values
+    needed = np.where(cost > 0, cost * (1.0 + target) - out['avoided_downtime_loss'], np.nan)
+    x = _divide(needed, coef)
+    return 100.0 * x if var == 'ef_percent' else x
+
+
+def _solve_loss(cols, target, output):
+    ef = np.clip(cols['ef_percent'], 0, 100) / 100.0
+    return _divide(target, ef * cols['aro'] * _ale_scale(cols, output))
+
+
+def _solve_ef(cols, target, output):
+    return _divide(100.0 * target, cols['loss_magnitude'] * cols['aro'] * _ale_scale(cols, output))
+
+
+def _solve_aro(cols, target, output):
+    ef = np.clip(cols['ef_percent'], 0, 100) / 100.0
+    return _divide(target, cols['loss_magnitude'] * ef * _ale_scale(cols, output))
+
+
+def _solve_downtime_rate(cols, target):
+    return _divide(target, batch.downtime_factor(cols) * cols['recovery_time_hours'])
+
+
+def _solve_recovery_hours(cols, target):
+    return _divide(target, batch.downtime_factor(cols) * cols['downtime_cost_per_hour'])
+
+
+CLOSED_FORMS = {
+    ('rosi', 'cost_of_controls'): _solve_cost,
+    ('rosi', 'loss_magnitude'): lambda c, t: _solve_rosi_linear(c, t, 'loss_magnitude'),
+    ('rosi', 'ef_percent'): lambda c, t: _solve_rosi_linear(c, t, 'ef_percent'),
+    ('rosi', 'aro'): lambda c, t: _solve_rosi_linear(c, t, 'aro'),
+    ('ale_pre', 'loss_magnitude'): lambda c, t: _solve_loss(c, t, 'ale_pre'),
+    ('ale_post', 'loss_magnitude'): lambda c, t: _solve_loss(c, t, 'ale_post'),
+    ('ale_pre', 'ef_percent'): lambda c, t: _solve_ef(c, t, 'ale_pre'),
+    ('ale_post', 'ef_percent'): lambda c, t: _solve_ef(c, t, 'ale_post'),
+    ('ale_pre', 'aro'): lambda c, t: _solve_aro(c, t, 'ale_pre'),
+    ('ale_post', 'aro'): lambda c, t: _solve_aro(c, t, 'ale_post'),
+    ('downtime_loss', 'downtime_cost_per_hour'): _solve_downtime_rate,
+    ('downtime_loss', 'recovery_time_hours'): _solve_recovery_hours,
+}
+
+
+def bisect(func, target, lo, hi, tol=1e-9, maxiter=200):
+    """
+    Vectorized bisection: find x in [lo, hi] with func(x) == target, elementwise.
+
+    func maps an array of x values to an array of outputs. Elements whose
+    bracket does not contain a sign change come back as NaN.
+    """
+    target = np.asarray(target, dtype=np.float64)
+    lo, hi = np.broadcast_arrays(np.asarray(lo, dtype=np.float64), np.asarray(hi, dtype=np.float64), target)[:2]
+    lo_bound, hi_bound = lo.copy(), hi.copy()
+    lo, hi = lo.copy(), hi.copy()
+    with np.errstate(invalid='ignore'):
+        f_lo = func(lo) - target
+        f_hi = func(hi) - target
+    valid = np.isfinite(f_lo) & np.isfinite(f_hi) & (np.sign(f_lo) * np.sign(f_hi) <= 0)
+    # direction from whichever end is nonzero, so a root on one bound still orients the search
+    lo_rising = (f_lo < 0) | (f_hi > 0)
+
+    for _ in range(maxiter):
+        mid = (lo + hi) / 2.0
+        with np.errstate(invalid='ignore'):
+            f_mid = func(mid) - target
+        # keep the half that still brackets the root
+        go_right = (f_mid < 0) == lo_rising
+        lo = np.where(go_right, mid, lo)
+        hi = np.where(go_right, hi, mid)
+        if not np.any(valid & (hi - lo > tol * (1.0 + np.abs(mid)))):
+            break
+
+    root = (lo + hi) / 2.0
+    root = np.where(f_hi == 0, hi_bound, root)
+    root = np.where(f_lo == 0, lo_bound, root)
+    return np.where(valid, root, np.nan)
+
+
+def _output(cols, var, output):
+    def func(x):
+        trial = dict(cols)
+        trial[var] = x
+        return batch.evaluate(trial)[output]
+    return func
+
+
+def solve(scenarios, target, solve_for, bracket=None, tol=1e-9, maxiter=200):
+    """
+    Solve for one scenario input so that an output hits a target value.
+
+    scenarios   dict of scenario columns (see tools/batch.py); the solve_for
+                column, if present, is ignored
+    target      (output, value) pair, e.g. ('rosi', 0.5); value may be an array
+    solve_for   the input column to solve for, one of BRACKETS
+    bracket     optional (lo, hi) search range for the bisection fallback
+
+    Returns a float array with one solution per scenario; NaN marks scenarios
+    where no input value in range reaches the target.
+    """
+    output, value = target
+    if output not in TARGETS:
+        raise ValueError(f'Unsupported target {output!r}; choose from {TARGETS}')
+    if solve_for not in BRACKETS:
+        raise ValueError(f'Cannot solve for {solve_for!r}; choose from {tuple(BRACKETS)}')
+
+    scenarios = {k: v for k, v in scenarios.items() if k != solve_for}
+    # Broadcast the target with the scenarios so it can vary per row
+    cols = batch.prepare(scenarios)
+    value, _ = np.broadcast_arrays(np.asarray(value, dtype=np.float64), cols['ef_percent'])
+
+    closed = CLOSED_FORMS.get((output, solve_for))
+    if closed is not None and bracket is None:
+        x = closed(cols, value)
+        if solve_for == 'ef_percent':
+            x = np.where((x >= 0) & (x <= 100), x, np.nan)
+        return np.where(x >= 0, x, np.nan)
+
+    lo, hi = bracket if bracket is not None else BRACKETS[solve_for]
+    return bisect(_output(cols, solve_for, output), value, lo, hi, tol=tol, maxiter=maxiter)
+
+
+def _parse_bool(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def read_scenarios_csv(path):
+    """Read scenario columns from a CSV file with a header row."""
+    with open(path, newline='') as fh:
+        rows = list(csv.DictReader(fh))
+    if not rows:
+        raise ValueError(f'No scenarios in {path}')
+    scenarios = {}
+    for name in rows[0]:
+        if name not in batch.INPUT_COLUMNS:
+            raise ValueError(f'Unknown column {name!r} in {path}')
+        values = [r[name] for r in rows]
+        if name in ('sector', 'strategy'):
+            scenarios[name] = values
+        elif name in ('mfa', 'phish', 'succession'):
+            scenarios[name] = [_parse_bool(v) for v in values]
+        else:
+            scenarios[name] = [float(v) if v != '' else np.nan for v in values]
+    return scenarios
+
+
+def _parse_target(text):
+    name, sep, value = text.partition('=')
+    if not sep or name not in TARGETS:
+        raise argparse.ArgumentTypeError(f'expected one of {TARGETS} as name=value, got {text!r}')
+    return name, float(value)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Solve for one input given a target output.')
+    p.add_argument('--target', type=_parse_target, required=True, help='Target output, e.g. rosi=0.5 or ale_post=100000')
+    p.add_argument('--solve-for', choices=list(BRACKETS), required=True, help='Input to solve for')
+    p.add_argument('--csv', type=str, default=None, help='CSV of scenarios (one per row); overrides the flags below')
+    p.add_argument('--sector', nargs='+', default=['Retail'], choices=list(SECTOR_DATA.keys()))
+    p.add_argument('--dr-strategy', nargs='+', default=['Cold Site'], choices=list(DR_STRATEGIES.keys()))
+    p.add_argument('--revenue', type=float, default=None, help='Loss magnitude (defaults to sector avg breach cost)')
+    p.add_argument('--ef', type=float, default=100)
+    p.add_argument('--aro', type=float, default=None, help='Override sector ARO')
+    p.add_argument('--cost', type=float, default=None, help='Cost of controls (defaults to DR + selected controls)')
+    p.add_argument('--mfa', action='store_true', help='Enable Multi-Factor Auth (reduce ARO 50%%)')
+    p.add_argument('--phish', action='store_true', help='Enable Phishing training (reduce ARO 20%%)')
+    p.add_argument('--succession', action='store_true', help='Enable Succession planning (reduce downtime cost 10%%)')
+    p.add_argument('--lo', type=float, default=None, help='Lower search bound (forces bisection)')
+    p.add_argument('--hi', type=float, default=None, help='Upper search bound (forces bisection)')
+    args = p.parse_args(argv)
+
+    if args.csv:
+        scenarios = read_scenarios_csv(args.csv)
+    else:
+        pairs = list(itertools.product(args.sector, args.dr_strategy))
+        scenarios = {
+            'sector': [s for s, _ in pairs],
+            'strategy': [d for _, d in pairs],
+            'ef_percent': args.ef,
+            'mfa': args.mfa,
+            'phish': args.phish,
+            'succession': args.succession,
+        }
+        for name, value in (('loss_magnitude', args.revenue), ('aro', args.aro), ('cost_of_controls', args.cost)):
+            if value is not None:
+                scenarios[name] = value
+
+    bracket = None
+    if args.lo is not None or args.hi is not None:
+        default_lo, default_hi = BRACKETS[args.solve_for]
+        bracket = (default_lo if args.lo is None else args.lo, default_hi if args.hi is None else args.hi)
+
+    result = solve(scenarios, args.target, args.solve_for, bracket=bracket)
+    cols = batch.prepare({k: v for k, v in scenarios.items() if k != args.solve_for})
+
+    name, value = args.target
+    print(f'Solving for {args.solve_for} with {name} = {value}')
+    writer = csv.writer(sys.stdout)
+    writer.writerow(['sector', 'strategy', args.solve_for])
+    money = args.solve_for in ('loss_magnitude', 'cost_of_controls', 'downtime_cost_per_hour')
+    for sector, strategy, x in zip(cols['sector'], cols['strategy'], result):
+        if np.isnan(x):
+            shown = 'unreachable'
+        else:
+            shown = fmt(x) if money else f'{x:.6g}'
+        writer.writerow([sector, strategy, shown])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+"""
+Append-only, memory-mapped columnar store for batch results.
+
+A store is a directory holding one raw little-endian file per column plus a
+meta.json that records the schema, the committed row count and the category
+dictionaries. Sector and strategy are stored as uint8 codes and indexed: for
+every (sector, strategy) pair the store keeps an ascending list of row ids, so
+filtered queries only touch the matching rows.
+
+Readers memory-map the column files and work through them in chunks, so
+filters, aggregates and top-k run over stores far larger than RAM:
+
+  store = ResultsStore('results/')
+  store.append(batch.compute_batch({...}))
+  store.aggregate('rosi', how='mean', by='strategy', sector='Retail')
+  store.top_k('rosi', k=10, where=[('ef_percent', '>=', 50)])
+
+meta.json is only rewritten after the column data has been flushed, so a
+writer killed mid-append leaves the store at its last committed row count;
+any trailing bytes are truncated the next time the store is opened.
+"""
+import json
+import operator
+import os
+
+import numpy as np
+
+from tools.calc import SECTOR_DATA, DR_STRATEGIES
+from tools.batch import INPUT_COLUMNS, OUTPUT_COLUMNS
+from tools.money import MONEY_OUTPUTS, sum_cents
+
+CATEGORY_COLUMNS = ('sector', 'strategy')
+
+# Column name -> numpy dtype string used on disk
+RESULT_SCHEMA = {name: '<f8' for name in INPUT_COLUMNS + OUTPUT_COLUMNS}
+RESULT_SCHEMA.update({'sector': '|u1', 'strategy': '|u1', 'mfa': '|b1', 'phish': '|b1', 'succession': '|b1'})
+
+# Results from money.compute(mode='exact') additionally keep the int64 cents
+EXACT_RESULT_SCHEMA = dict(RESULT_SCHEMA, **{f'{name}_cents': '<i8' for name in MONEY_OUTPUTS + ('cost_of_controls',)})
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')
+
+DEFAULT_CHUNK_ROWS = 1 << 20
+
+
+class ResultsStore:
+    """A directory-backed columnar store. Create or open with ResultsStore(path)."""
+
+    def __init__(self, path, schema=None):
+        self.path = path
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as fh:
+                self.meta = json.load(fh)
+            if schema is not None and dict(schema) != self.schema:
+                raise ValueError(f'Store at {path} has a different schema')
+            self._recover()
+        else:
+            schema = dict(schema or RESULT_SCHEMA)
+            for name in CATEGORY_COLUMNS:
+                if schema.get(name) != '|u1':
+                    raise ValueError(f'Schema must store {name!r} as |u1 codes')
+            os.makedirs(os.path.join(path, 'index'), exist_ok=True)
+            self.meta = {
+                'version': 1,
+                'rows': 0,
+                'schema': list(schema.items()),
+                'categories': {'sector': list(SECTOR_DATA), 'strategy': list(DR_STRATEGIES)},
+                'index': {},
+            }
+            self._commit()
+
+    @property
+    def schema(self):
+        return dict(self.meta['schema'])
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f'{name}.col')
+
+    def _index_path(self, key):
+        return os.path.join(self.path, 'index', f'{key}.idx')
+
+    def _commit(self):
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w') as fh:
+            json.dump(self.meta, fh, indent=1)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
+
+    def _truncate_file(self, path, nbytes):
+        if os.path.exists(path) and os.path.getsize(path) > nbytes:
+            with open(path, 'r+b') as fh:
+                fh.truncate(nbytes)
+
+    def _recover(self):
+        # Drop bytes written after the last committed append
+        rows = self.meta['rows']
+        for name, dtype in self.schema.items():
+            self._truncate_file(self._column_path(name), rows * np.dtype(dtype).itemsize)
+        # Posting lists for pairs the meta doesn't know were never committed
+        index_dir = os.path.join(self.path, 'index')
+        for filename in os.listdir(index_dir):
+            key, ext = os.path.splitext(filename)
+            if ext != '.idx':
+                continue
+            if key in self.meta['index']:
+                self._truncate_file(self._index_path(key), self.meta['index'][key] * 8)
+            else:
+                os.remove(self._index_path(key))
+
+    # ----- writing -----
+
+    def encode(self, name, values):
+        """Map category names to codes, extending the dictionary with unseen names."""
+        categories = self.meta['categories'][name]
+        values = np.ravel(values)
+        codes = np.zeros(values.shape, dtype=np.uint8)
+        matched = np.zeros(values.shape, dtype=bool)
+        for code, category in enumerate(categories):
+            hit = values == category
+            codes[hit] = code
+            matched |= hit
+        for new in np.unique(values[~matched].astype(str)):
+            if len(categories) >= 256:
+                raise ValueError(f'Too many distinct {name} values for a uint8 column')
+            categories.append(str(new))
+            codes[values == new] = len(categories) - 1
+        return codes
+
+    def append(self, columns):
+        """
+        Append a batch of rows. columns must contain every schema column
+        (extra keys, such as intermediate outputs, are ignored). Returns the
+        number of rows written.
+        """
+        missing = [name for name in self.schema if name not in columns]
+        if missing:
+            raise ValueError(f'Batch is missing columns: {missing}')
+        data = {}
+        for name, dtype in self.schema.items():
+            if name in CATEGORY_COLUMNS:
+                data[name] = self.encode(name, columns[name])
+            else:
+                data[name] = np.ascontiguousarray(columns[name], dtype=dtype).reshape(-1)
+        n = len(data['sector'])
+        if any(len(a) != n for a in data.values()):
+            raise ValueError('All columns in a batch must have the same length')
+        if n == 0:
+            return 0
+
+        start = self.meta['rows']
+        for name, values in data.items():
+            with open(self._column_path(name), 'ab') as fh:
+                values.tofile(fh)
+                fh.flush()
+                os.fsync(fh.fileno())
+
+        # Posting lists: append the new row ids for every (sector, strategy) pair
+        keys = data['sector'].astype(np.int64) * 256 + data['strategy']
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+        for group in np.split(order, bounds):
+            key = f'{data["sector"][group[0]]}-{data["strategy"][group[0]]}'
+            with open(self._index_path(key), 'ab') as fh:
+                (group.astype('<i8') + start).tofile(fh)
+                fh.flush()
+                os.fsync(fh.fileno())
+            self.meta['index'][key] = self.meta['index'].get(key, 0) + len(group)
+
+        self.meta['rows'] = start + n
+        self._commit()
+        return n
+
+    def truncate(self, rows):
+        """Drop every row from row id `rows` onwards, e.g. to roll back to a checkpoint."""
+        if rows < 0 or rows > self.meta['rows']:
+            raise ValueError(f'Cannot truncate a store of {self.meta["rows"]} rows to {rows}')
+        for key, count in list(self.meta['index'].items()):
+            ids = np.memmap(self._index_path(key), dtype='<i8', mode='r', shape=(count,))
+            # posting lists are ascending, so the rows to keep form a prefix
+            keep = int(np.searchsorted(ids, rows))
+            del ids
+            if keep:
+                self.meta['index'][key] = keep
+            else:
+                del self.meta['index'][key]
+        self.meta['rows'] = rows
+        # commit first: _recover then trims the files and deletes the emptied
+        # posting lists, so a crash in between leaves a consistent store
+        self._commit()
+        self._recover()
+
+    # ----- reading -----
+
+    def column(self, name):
+        """Read-only memory map of a full column."""
+        dtype = self.schema[name]
+        if self.meta['rows'] == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._column_path(name), dtype=dtype, mode='r', shape=(self.meta['rows'],))
+
+    def decode(self, name, codes):
+        """Map category codes back to names."""
+        return np.asarray(self.meta['categories'][name], dtype=object)[np.asarray(codes, dtype=np.intp)]
+
+    def _codes(self, name, wanted):
+        if wanted is None:
+            return None
+        if isinstance(wanted, str):
+            wanted = [wanted]
+        categories = self.meta['categories'][name]
+        return {categories.index(w) for w in wanted if w in categories}
+
+    def _row_ranges(self, sector, strategy, chunk_rows):
+        # Yields either slices over the whole store or arrays of row ids from the index
+        sectors = self._codes('sector', sector)
+        strategies = self._codes('strategy', strategy)
+        if sectors is None and strategies is None:
+            for lo in range(0, self.meta['rows'], chunk_rows):
+                yield slice(lo, min(lo + chunk_rows, self.meta['rows']))
+            return
+        for key, count in sorted(self.meta['index'].items()):
+            s, d = (int(c) for c in key.split('-'))
+            if (sectors is not None and s not in sectors) or (strategies is not None and d not in strategies):
+                continue
+            ids = np.memmap(self._index_path(key), dtype='<i8', mode='r', shape=(count,))
+            for lo in range(0, count, chunk_rows):
+                yield np.asarray(ids[lo:lo + chunk_rows])
+
+    def scan(self, columns=None, where=None, sector=None, strategy=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Iterate over matching rows chunk by chunk.
+
+        columns   names to return (default: all schema columns)
+        where     list of (column, op, value) filters, op one of OPERATORS
+        sector    sector name or list of names, answered from the index
+        strategy  strategy name or list of names, answered from the index
+
+        Yields dicts of arrays, including a '_row' column of row ids. Category
+        columns are returned as codes; use decode() to turn them into names.
+        """
+        columns = list(self.schema) if columns is None else list(columns)
+        where = list(where or [])
+        for name, op, _ in where:
+            if name not in self.schema:
+                raise ValueError(f'Unknown column {name!r}')
+            if op not in OPERATORS:
+                raise ValueError(f'Unknown operator {op!r}; choose from {tuple(OPERATORS)}')
+        needed = set(columns) | {name for name, _, _ in where}
+        maps = {name: self.column(name) for name in needed}
+
+        for rows in self._row_ranges(sector, strategy, chunk_rows):
+            chunk = {name: np.asarray(m[rows]) for name, m in maps.items()}
+            row_ids = np.arange(rows.start, rows.stop) if isinstance(rows, slice) else rows
+            mask = None
+            for name, op, value in where:
+                if name in CATEGORY_COLUMNS:
+                    value = self.meta['categories'][name].index(value) if value in self.meta['categories'][name] else -1
+                hit = OPERATORS[op](chunk[name], value)
+                mask = hit if mask is None else mask & hit
+            if mask is not None:
+                if not mask.any():
+                    continue
+                row_ids = row_ids[mask]
+                chunk = {name: values[mask] for name, values in chunk.items()}
+            out = {name: chunk[name] for name in columns}
+            out['_row'] = row_ids
+            yield out
+
+    def count(self, **filters):
+        """Number of rows matching the scan() filters."""
+        return sum(len(chunk['_row']) for chunk in self.scan(columns=[], **filters))
+
+    def aggregate(self, column, how='sum', by=None, **filters):
+        """
+        Aggregate a column over the rows matching the scan() filters. NaN
+        values are skipped. With by='sector' or by='strategy' returns a dict
+        of category name -> value, otherwise a single number. Sums over
+        integer columns (such as the *_cents columns) are exact Python ints.
+        """
+        if how not in AGGREGATES:
+            raise ValueError(f'Unknown aggregate {how!r}; choose from {AGGREGATES}')
+        if by is not None and by not in CATEGORY_COLUMNS:
+            raise ValueError(f'Can only group by {CATEGORY_COLUMNS}')
+
+        exact = np.dtype(self.schema[column]).kind in 'iu'
+        n_groups = len(self.meta['categories'][by]) if by else 1
+        counts = np.zeros(n_groups, dtype=np.int64)
+        sums = [0] * n_groups if exact else np.zeros(n_groups)
+        if exact:
+            mins = np.full(n_groups, np.iinfo(np.int64).max)
+            maxs = np.full(n_groups, np.iinfo(np.int64).min)
+        else:
+            mins = np.full(n_groups, np.inf)
+            maxs = np.full(n_groups, -np.inf)
+        columns = [column] + ([by] if by else [])
+        for chunk in self.scan(columns=columns, **filters):
+            values = chunk[column]
+            if exact:
+                values = values.astype(np.int64)
+            else:
+                values = values.astype(np.float64)
+                keep = ~np.isnan(values)
+                chunk = {name: arr[keep] for name, arr in chunk.items()}
+                values = values[keep]
+            groups = chunk[by].astype(np.intp) if by else np.zeros(len(values), dtype=np.intp)
+            counts += np.bincount(groups, minlength=n_groups)
+            if exact:
+                for g in np.unique(groups):
+                    sums[g] += sum_cents(values[groups == g])
+            else:
+                sums += np.bincount(groups, weights=values, minlength=n_groups)
+            if how in ('min', 'max'):
+                np.minimum.at(mins, groups, values)
+                np.maximum.at(maxs, groups, values)
+
+        def value(i):
+            if counts[i] == 0 and how in ('mean', 'min', 'max'):
+                return float('nan')
+            if how == 'count':
+                return int(counts[i])
+            if how == 'sum':
+                return sums[i] if exact else float(sums[i])
+            if how == 'mean':
+                return sums[i] / int(counts[i])
+            extreme = mins[i] if how == 'min' else maxs[i]
+            return int(extreme) if exact else float(extreme)
+
+        if by is None:
+            return value(0)
+        names = self.meta['categories'][by]
+        return {names[i]: value(i) for i in range(n_groups) if counts[i] > 0}
+
+    def top_k(self, column, k=10, largest=True, columns=None, **filters):
+        """
+        The k rows with the largest (or smallest) values of column among the
+        rows matching the scan() filters, best first. NaN values are skipped.
+        Returns a dict of arrays with category columns decoded to names.
+        """
+        if k < 1:
+            raise ValueError('k must be at least 1')
+        columns = list(self.schema) if columns is None else list(columns)
+        wanted = list(dict.fromkeys([column] + columns))
+        # rank on int64 for integer and bool columns so *_cents stay exact and
+        # negating never wraps or fails, float64 for everything else
+        rank_dtype = np.int64 if np.dtype(self.schema[column]).kind in 'iub' else np.float64
+        sign = 1 if largest else -1
+        best = None
+        for chunk in self.scan(columns=wanted, **filters):
+            keep = ~np.isnan(chunk[column].astype(np.float64))
+            chunk = {name: values[keep] for name, values in chunk.items()}
+            if best is not None:
+                chunk = {name: np.concatenate([best[name], chunk[name]]) for name in chunk}
+            values = sign * chunk[column].astype(rank_dtype)
+            if len(values) > k:
+                pick = np.argpartition(-values, k - 1)[:k]
+                chunk = {name: arr[pick] for name, arr in chunk.items()}
+            best = chunk
+
+        if best is None:
+            return {name: np.empty(0) for name in columns + ['_row']}
+        values = sign * best[column].astype(rank_dtype)
+        order = np.lexsort((best['_row'], -values))
+        result = {name: best[name][order] for name in columns + ['_row']}
+        for name in CATEGORY_COLUMNS:
+            if name in result:
+                result[name] = self.decode(name, result[name])
+        return result
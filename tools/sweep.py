@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Resumable parallel parameter sweeps.
+
+A sweep evaluates the full cross-product of a declarative grid spec and
+writes every scenario to a results store (tools/store.py). The grid is a
+JSON object; every key is optional:
+
+  {
+    "sectors": ["Retail", "Finance"],             # default: all of SECTOR_DATA
+    "strategies": ["Cold Site", "Hot Site"],      # default: all of DR_STRATEGIES
+    "loss_magnitude": [100000, 250000],           # default: sector AvgBreachCost
+    "ef_percent": {"start": 0, "stop": 100, "step": 1},
+    "aro": [null, 0.3],                           # null = sector ARO
+    "controls": "all",                            # or e.g. [[], ["mfa"], ["mfa", "phish"]]
+    "mode": "float",                              # or "exact" (see tools/money.py)
+    "unit_rows": 1000000                          # scenarios per work unit
+  }
+
+Ranges given as {"start", "stop", "step"} include stop. Asset values are
+swept through loss_magnitude (the CLI's --revenue): ALE, downtime and ROSI
+are computed from the loss magnitude, while the CLI's --asset only feeds the
+printed SLE, which the results store doesn't keep. The flattened grid
+is cut into work units of unit_rows scenarios, which run across a local
+process pool. Finished units are appended to the store and recorded in
+checkpoint.jsonl in the output directory; rerunning the same sweep into the
+same directory skips finished units and rolls back any rows written after
+the last checkpoint.
+
+Usage:
+  python -m tools.sweep grid.json --out results/ --workers 8
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from tools.calc import SECTOR_DATA, DR_STRATEGIES
+from tools import money
+from tools.store import ResultsStore, RESULT_SCHEMA, EXACT_RESULT_SCHEMA
+
+CONTROLS = ('mfa', 'phish', 'succession')
+
+# Grid axes in the order they are flattened (the last axis varies fastest)
+AXES = ('sector', 'strategy', 'loss_magnitude', 'ef_percent', 'aro', 'controls')
+
+DEFAULT_UNIT_ROWS = 1_000_000
+
+
+def _values(spec, key, default):
+    value = spec.get(key, default)
+    if isinstance(value, dict):
+        start, stop, step = value['start'], value['stop'], value.get('step', 1)
+        if step <= 0:
+            raise ValueError(f'{key}: step must be positive')
+        # include stop, allowing for float error in the step
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return [start + i * step for i in range(count)]
+    if not isinstance(value, list) or not value:
+        raise ValueError(f'{key}: expected a non-empty list or a start/stop/step range')
+    return value
+
+
+def expand_spec(spec):
+    """Validate a grid spec and return it with every axis expanded to a list."""
+    known = {'sectors', 'strategies', 'loss_magnitude', 'ef_percent', 'aro', 'controls', 'mode', 'unit_rows'}
+    unknown = set(spec) - known
+    if unknown:
+        raise ValueError(f'Unknown grid keys: {sorted(unknown)}')
+
+    controls = spec.get('controls', 'all')
+    if controls == 'all':
+        controls = [[name for name, on in zip(CONTROLS, flags) if on]
+                    for flags in itertools.product((False, True), repeat=len(CONTROLS))]
+    for combo in controls:
+        bad = set(combo) - set(CONTROLS)
+        if bad:
+            raise ValueError(f'Unknown controls: {sorted(bad)}')
+
+    grid = {
+        'sector': _values(spec, 'sectors', list(SECTOR_DATA)),
+        'strategy': _values(spec, 'strategies', list(DR_STRATEGIES)),
+        'loss_magnitude': _values(spec, 'loss_magnitude', [None]),
+        'ef_percent': _values(spec, 'ef_percent', [100]),
+        'aro': _values(spec, 'aro', [None]),
+        'controls': [sorted(combo) for combo in controls],
+        'mode': spec.get('mode', 'float'),
+        'unit_rows': int(spec.get('unit_rows', DEFAULT_UNIT_ROWS)),
+    }
+    for name in grid['sector']:
+        if name not in SECTOR_DATA:
+            raise ValueError(f'Unknown sector {name!r}')
+    for name in grid['strategy']:
+        if name not in DR_STRATEGIES:
+            raise ValueError(f'Unknown strategy {name!r}')
+    if grid['mode'] not in money.MONEY_MODES:
+        raise ValueError(f'Unknown money mode {grid["mode"]!r}; choose from {money.MONEY_MODES}')
+    if grid['unit_rows'] < 1:
+        raise ValueError('unit_rows must be at least 1')
+    return grid
+
+
+def grid_size(grid):
+    return int(np.prod([len(grid[axis]) for axis in AXES], dtype=object))
+
+
+def work_units(grid):
+    """List of (unit id, first row, end row) covering the flattened grid."""
+    total, step = grid_size(grid), grid['unit_rows']
+    return [(i, lo, min(lo + step, total)) for i, lo in enumerate(range(0, total, step))]
+
+
+def scenarios_for(grid, lo, hi):
+    """Scenario columns for flat grid positions lo..hi-1."""
+    shape = tuple(len(grid[axis]) for axis in AXES)
+    pos = dict(zip(AXES, np.unravel_index(np.arange(lo, hi), shape)))
+
+    def column(axis, dtype):
+        values = np.array([np.nan if v is None else v for v in grid[axis]], dtype=dtype)
+        return values[pos[axis]]
+
+    controls = np.array([[name in combo for name in CONTROLS] for combo in grid['controls']], dtype=bool)
+    picked = controls[pos['controls']]
+    scenarios = {
+        'sector': column('sector', object).astype(str),
+        'strategy': column('strategy', object).astype(str),
+        'loss_magnitude': column('loss_magnitude', np.float64),
+        'ef_percent': column('ef_percent', np.float64),
+        'aro': column('aro', np.float64),
+    }
+    for i, name in enumerate(CONTROLS):
+        scenarios[name] = picked[:, i]
+    return scenarios
+
+
+def run_unit(grid, lo, hi):
+    """Evaluate one work unit. Returns only the columns the store keeps."""
+    schema = EXACT_RESULT_SCHEMA if grid['mode'] == 'exact' else RESULT_SCHEMA
+    result = money.compute(scenarios_for(grid, lo, hi), mode=grid['mode'])
+    return {name: result[name] for name in schema}
+
+
+def _read_checkpoint(path):
+    """
+    Finished unit ids and committed row count from a checkpoint file.
+
+    A torn final line from an interrupted write is cut off, so entries
+    appended afterwards start on a clean line.
+    """
+    done, rows = set(), 0
+    if not os.path.exists(path):
+        return done, rows
+    valid = 0
+    with open(path, 'rb') as fh:
+        for line in fh:
+            try:
+                if not line.endswith(b'\n'):
+                    raise ValueError('incomplete line')
+                entry = json.loads(line)
+            except ValueError:
+                break
+            done.add(entry['unit'])
+            rows = max(rows, entry['rows'])
+            valid += len(line)
+    if os.path.getsize(path) > valid:
+        with open(path, 'r+b') as fh:
+            fh.truncate(valid)
+    return done, rows
+
+
+def print_progress(done, total, rows, elapsed):
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f'[sweep] {done}/{total} units, {rows:,} rows this run, {rate:,.0f} rows/s', file=sys.stderr)
+
+
+def run_sweep(spec, out_dir, workers=None, progress=print_progress):
+    """
+    Run (or resume) a sweep of the grid spec into out_dir.
+
+    workers   process pool size (default: os.cpu_count()); 1 runs inline
+    progress  called as progress(units_done, units_total, rows_written, seconds)
+              after every finished unit, where rows_written and seconds
+              cover this run only (not earlier, resumed-from runs); pass
+              None to disable
+
+    Returns the ResultsStore holding the results.
+    """
+    grid = expand_spec(spec)
+    os.makedirs(out_dir, exist_ok=True)
+    spec_path = os.path.join(out_dir, 'sweep.json')
+    if os.path.exists(spec_path):
+        with open(spec_path) as fh:
+            if json.load(fh) != grid:
+                raise ValueError(f'{out_dir} holds a different sweep; use a new output directory')
+    else:
+        with open(spec_path, 'w') as fh:
+            json.dump(grid, fh, indent=1)
+
+    schema = EXACT_RESULT_SCHEMA if grid['mode'] == 'exact' else RESULT_SCHEMA
+    store = ResultsStore(os.path.join(out_dir, 'store'), schema=schema)
+    checkpoint_path = os.path.join(out_dir, 'checkpoint.jsonl')
+    done, committed = _read_checkpoint(checkpoint_path)
+    if len(store) != committed:
+        # rows appended after the last checkpoint belong to an unfinished unit
+        store.truncate(committed)
+
+    units = work_units(grid)
+    pending = [u for u in units if u[0] not in done]
+    start = time.time()
+    written = 0
+
+    with open(checkpoint_path, 'a') as checkpoint:
+        def finish(unit_id, columns):
+            nonlocal written
+            written += store.append(columns)
+            checkpoint.write(json.dumps({'unit': unit_id, 'rows': len(store)}) + '\n')
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+            done.add(unit_id)
+            if progress is not None:
+                progress(len(done), len(units), written, time.time() - start)
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            for unit_id, lo, hi in pending:
+                finish(unit_id, run_unit(grid, lo, hi))
+            return store
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            queue = iter(pending)
+            running = {}
+            # keep a bounded number of units in flight so finished results don't pile up in memory
+            for unit_id, lo, hi in itertools.islice(queue, 2 * workers):
+                running[pool.submit(run_unit, grid, lo, hi)] = unit_id
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finish(running.pop(future), future.result())
+                    for unit_id, lo, hi in itertools.islice(queue, 1):
+                        running[pool.submit(run_unit, grid, lo, hi)] = unit_id
+    return store
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Run a resumable parameter sweep into a results store.')
+    p.add_argument('spec', help='Path to a JSON grid spec')
+    p.add_argument('--out', required=True, help='Output directory (rerun with the same directory to resume)')
+    p.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    p.add_argument('--mode', choices=money.MONEY_MODES, default=None, help='Override the spec money mode')
+    p.add_argument('--unit-rows', type=int, default=None, help='Override the spec work unit size')
+    args = p.parse_args(argv)
+
+    with open(args.spec) as fh:
+        spec = json.load(fh)
+    if args.mode is not None:
+        spec['mode'] = args.mode
+    if args.unit_rows is not None:
+        spec['unit_rows'] = args.unit_rows
+
+    grid = expand_spec(spec)
+    print(f'Sweeping {grid_size(grid):,} scenarios in {len(work_units(grid))} units -> {args.out}')
+    store = run_sweep(spec, args.out, workers=args.workers)
+    print(f'Done: {len(store):,} rows in {os.path.join(args.out, "store")}')
+
+
+if __name__ == '__main__':
+    main()